@@ -7,23 +7,34 @@ pair (technically two files).
 """
 
 import base64
+import contextlib
 import hashlib
 import os
+from functools import cached_property
 
 import yaml
 
-from fmu.sumo.uploader._logger import get_uploader_logger
+from fmu.sumo.uploader._logger import get_uploader_logger, set_logger_level
 from fmu.sumo.uploader._sumofile import SumoFile, _path_to_yaml_path
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
 # pylint: disable=C0103 # allow non-snake case variable names
 
 logger = get_uploader_logger()
 
+# Files larger than this are streamed from disk during blob upload
+# instead of being read into memory first.
+STREAM_UPLOAD_THRESHOLD = 16 * 1024 * 1024
+
 
 def parse_yaml(path):
     """From path, parse file as yaml, return data"""
     with open(path, "r") as stream:
-        data = yaml.safe_load(stream)
+        data = yaml.load(stream, Loader=YamlLoader)
     return data
 
 
@@ -38,6 +49,35 @@ def file_to_byte_string(path):
     return byte_string
 
 
+def file_md5(f):
+    """
+    Given an open binary file, return an md5 digester of its content.
+
+    Uses hashlib.file_digest where available (Python 3.11+), which hashes
+    straight from the file without creating a bytes object for the content.
+    """
+
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(f, "md5")
+
+    digester = hashlib.md5()
+    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+        digester.update(chunk)
+    return digester
+
+
+def _advise_sequential(f):
+    """Tell the OS that an open file will be read sequentially.
+
+    On Linux this increases the readahead for the file, so that hashing
+    a large file spends less time waiting for the disk. Does nothing
+    where posix_fadvise is not available."""
+
+    if hasattr(os, "posix_fadvise"):
+        with contextlib.suppress(OSError):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
 class FileOnDisk(SumoFile):
     def __init__(self, path: str, metadata_path=None, verbosity="WARNING"):
         """
@@ -46,7 +86,7 @@ class FileOnDisk(SumoFile):
                              path will be derived from file path.
         """
 
-        logger.setLevel(level=verbosity)
+        set_logger_level(logger, verbosity)
 
         self.metadata_path = (
             metadata_path if metadata_path else _path_to_yaml_path(path)
@@ -54,8 +94,6 @@ class FileOnDisk(SumoFile):
         self.path = os.path.abspath(path)
         self.metadata = parse_yaml(self.metadata_path)
 
-        self._size = os.path.getsize(self.path)
-
         self.basename = os.path.basename(self.path)
         self.dir_name = os.path.dirname(self.path)
 
@@ -66,12 +104,56 @@ class FileOnDisk(SumoFile):
 
         self.metadata["_sumo"] = {}
 
-        self.byte_string = file_to_byte_string(path)
-        self.metadata["_sumo"]["blob_size"] = len(self.byte_string)
-        digester = hashlib.md5(self.byte_string)
-        self.metadata["_sumo"]["blob_md5"] = base64.b64encode(
-            digester.digest()
-        ).decode("utf-8")
+        self._size = os.stat(self.path).st_size
+        self.metadata["_sumo"]["blob_size"] = self._size
+
+    @cached_property
+    def blob_md5(self):
+        """Return the base64 encoded md5 of the file content.
+
+        The file is hashed on first access rather than when indexed, so
+        that hashing is done in the upload threads. Files up to
+        STREAM_UPLOAD_THRESHOLD are hashed from byte_string, the same
+        bytes that are uploaded. Larger files are hashed from disk and
+        read again when streamed to blob storage. The md5 is also added
+        to the metadata.
+        """
+        if self._size <= STREAM_UPLOAD_THRESHOLD:
+            digester = hashlib.md5(self.byte_string)
+        else:
+            with open(self.path, "rb") as f:
+                _advise_sequential(f)
+                digester = file_md5(f)
+        blob_md5 = base64.b64encode(digester.digest()).decode("utf-8")
+        self.metadata["_sumo"]["blob_md5"] = blob_md5
+        return blob_md5
+
+    @cached_property
+    def byte_string(self):
+        """Return the file content, read from disk on first access.
+
+        The content is dropped again when upload_to_sumo returns, so
+        indexed files do not hold their blobs in memory while waiting
+        for upload.
+        """
+        return file_to_byte_string(self.path)
+
+    def upload_to_sumo(
+        self, sumo_parent_id, sumoclient, sumo_mode, blob_transport=None
+    ):
+        try:
+            return super().upload_to_sumo(
+                sumo_parent_id, sumoclient, sumo_mode, blob_transport
+            )
+        finally:
+            self.__dict__.pop("byte_string", None)
+
+    def _upload_byte_string(self, blob_url, transport=None):
+        if self._size <= STREAM_UPLOAD_THRESHOLD:
+            return super()._upload_byte_string(blob_url, transport)
+
+        with open(self.path, "rb") as stream:
+            return self._upload_blob(blob_url, stream, self._size, transport)
 
     def __repr__(self):
         if not self.metadata:
@@ -80,8 +162,8 @@ class FileOnDisk(SumoFile):
         s = f"\n# {self.__class__}"
         s += f"\n# Disk path: {self.path}"
         s += f"\n# Basename: {self.basename}"
-        if self.byte_string is not None:
-            s += f"\n# Byte string length: {len(self.byte_string)}"
+        if self._size is not None:
+            s += f"\n# Byte string length: {self._size}"
 
         if self.sumo_object_id is not None:
             s += f"\n# Uploaded to Sumo. Sumo_ID: {self.sumo_object_id}"
@@ -39,3 +39,8 @@ class FileOnJob(SumoFile):
             digester.digest()
         ).decode("utf-8")
         self.metadata["file"]["checksum_md5"] = digester.hexdigest()
+
+    @property
+    def blob_md5(self):
+        """Return the base64 encoded md5 of the blob"""
+        return self.metadata["_sumo"]["blob_md5"]
@@ -37,3 +37,19 @@ def get_uploader_logger():
         logger.addHandler(stderr_handler)
 
     return logger
+
+
+def set_logger_level(logger, level):
+    """Set the level of a logger, unless it already has that level.
+
+    Logger.setLevel clears the cached levels of all loggers, so it is
+    skipped when the level is unchanged, as when a logger level is set
+    for every file.
+    """
+    if isinstance(level, str):
+        numeric_level = logging.getLevelName(level)
+    else:
+        numeric_level = level
+
+    if logger.level != numeric_level:
+        logger.setLevel(level)
@@ -5,11 +5,13 @@ Base class for CaseOnJob and CaseOnDisk classes.
 """
 
 import datetime
+import logging
 import statistics
 import time
 import warnings
+from functools import cached_property
 
-from fmu.sumo.uploader._logger import get_uploader_logger
+from fmu.sumo.uploader._logger import get_uploader_logger, set_logger_level
 from fmu.sumo.uploader._upload_files import upload_files
 
 # pylint: disable=C0103 # allow non-snake case variable names
@@ -27,7 +29,7 @@ class SumoCase:
         config_path="fmuconfig/output/global_variables.yml",
         parameters_path="parameters.txt",
     ):
-        logger.setLevel(verbosity)
+        set_logger_level(logger, verbosity)
         self.sumoclient = sumoclient
         self.case_metadata = _sanitize_datetimes(case_metadata)
         self._fmu_case_uuid = self._get_fmu_case_uuid()
@@ -38,32 +40,46 @@ class SumoCase:
         logger.debug("self._sumo_parent_id is %s", self._sumo_parent_id)
         self._files = []
         self.sumo_mode = sumo_mode
+        self._case_clients = {}
 
         return
 
+    @cached_property
+    def _sumo_logger(self):
+        """Return the logger that sends log messages to Sumo.
+
+        Created on first use, as logging to it sends requests to Sumo."""
+        sumo_logger = self.sumoclient.getLogger("fmu-sumo-uploader")
+        sumo_logger.setLevel(logging.INFO)
+        # Avoid that logging to sumo-server also is visible in local logging:
+        sumo_logger.propagate = False
+        return sumo_logger
+
     def _get_fmu_case_uuid(self):
         """Return case_id from case_metadata."""
-        fmu_case_uuid = None
         try:
-            if (
-                self.case_metadata
-                and self.case_metadata.get("fmu")
-                and self.case_metadata.get("fmu").get("case")
-            ):
-                fmu_case_uuid = (
-                    self.case_metadata.get("fmu").get("case").get("uuid")
-                )
-            if not fmu_case_uuid:
-                err_msg = "Invalid metadata: Could not get fmu.case.uuid from case metadata"
-                warnings.warn(err_msg)
-                return None
-            else:
-                return fmu_case_uuid
-        except Exception as err:
-            err_msg = f"Invalid metadata: Could not get fmu.case.uuid from case metadata: {err} {type(err)}"
+            fmu_case_uuid = self.case_metadata["fmu"]["case"]["uuid"]
+        except (KeyError, TypeError, AttributeError):
+            fmu_case_uuid = None
+
+        if not fmu_case_uuid:
+            err_msg = "Invalid metadata: Could not get fmu.case.uuid from case metadata"
             warnings.warn(err_msg)
             return None
 
+        return fmu_case_uuid
+
+    def _client_for_case(self, case_uuid):
+        """Return the Sumo client for uploading to a case.
+
+        client_for_case may create a new client, with its own connections,
+        so the client is kept and reused for later uploads to the case."""
+        if case_uuid not in self._case_clients:
+            self._case_clients[case_uuid] = self.sumoclient.client_for_case(
+                case_uuid
+            )
+        return self._case_clients[case_uuid]
+
     def upload(self, threads=4):
         """Trigger upload of files.
 
@@ -72,6 +88,12 @@ class SumoCase:
 
         Retry the failed uploads X times."""
 
+        self._sumo_logger.info(
+            "Initializing Sumo upload for case with sumo_parent_id: "
+            + str(self._sumo_parent_id),
+            extra={"objectUuid": self._sumo_parent_id},
+        )
+
         if not self.files:
             err_msg = "No files to upload. Check search string."
             logger.warning(err_msg)
@@ -82,11 +104,15 @@ class SumoCase:
         rejected_uploads = []
         files_to_upload = list(self.files)
 
+        # Start the largest blobs first, and let the small ones fill in
+        # around them, so the upload does not end waiting on one large blob
+        files_to_upload.sort(key=lambda file: file._size or 0, reverse=True)
+
         _t0 = time.perf_counter()
 
         logger.debug("files_to_upload: %s", files_to_upload)
 
-        sumoclient = self.sumoclient.client_for_case(self._sumo_parent_id)
+        sumoclient = self._client_for_case(self._sumo_parent_id)
 
         upload_results = upload_files(
             files_to_upload,
@@ -126,20 +152,23 @@ class SumoCase:
 
         if rejected_uploads:
             logger.info(
-                f"\n\n{len(rejected_uploads)} files rejected by Sumo. First 5 rejected files:"
+                "\n\n%s files rejected by Sumo. First 5 rejected files:",
+                len(rejected_uploads),
             )
 
             for u in rejected_uploads[0:4]:
                 logger.info("\n" + "=" * 50)
 
-                logger.info(f"Filepath: {u.get('blob_file_path')}")
+                logger.info("Filepath: %s", u.get("blob_file_path"))
                 logger.info(
-                    f"Metadata: [{u.get('metadata_upload_response_status_code')}] "
-                    f"{u.get('metadata_upload_response_text')}"
+                    "Metadata: [%s] %s",
+                    u.get("metadata_upload_response_status_code"),
+                    u.get("metadata_upload_response_text"),
                 )
                 logger.info(
-                    f"Blob: [{u.get('blob_upload_response_status_code')}] "
-                    f"{u.get('blob_upload_response_status_text')}"
+                    "Blob: [%s] %s",
+                    u.get("blob_upload_response_status_code"),
+                    u.get("blob_upload_response_status_text"),
                 )
                 self._sumo_logger.info(
                     _get_log_msg(self.sumo_parent_id, u),
@@ -148,20 +177,23 @@ class SumoCase:
 
         if failed_uploads:
             logger.info(
-                f"\n\n{len(failed_uploads)} files failed by Sumo. First 5 failed files:"
+                "\n\n%s files failed by Sumo. First 5 failed files:",
+                len(failed_uploads),
             )
 
             for u in failed_uploads[0:4]:
                 logger.info("\n" + "=" * 50)
 
-                logger.info(f"Filepath: {u.get('blob_file_path')}")
+                logger.info("Filepath: %s", u.get("blob_file_path"))
                 logger.info(
-                    f"Metadata: [{u.get('metadata_upload_response_status_code')}] "
-                    f"{u.get('metadata_upload_response_text')}"
+                    "Metadata: [%s] %s",
+                    u.get("metadata_upload_response_status_code"),
+                    u.get("metadata_upload_response_text"),
                 )
                 logger.info(
-                    f"Blob: [{u.get('blob_upload_response_status_code')}] "
-                    f"{u.get('blob_upload_response_status_text')}"
+                    "Blob: [%s] %s",
+                    u.get("blob_upload_response_status_code"),
+                    u.get("blob_upload_response_status_text"),
                 )
                 self._sumo_logger.info(
                     _get_log_msg(self.sumo_parent_id, u),
@@ -173,8 +205,8 @@ class SumoCase:
         logger.info("OK: %s", str(len(ok_uploads)))
         logger.info("Failed: %s", str(len(failed_uploads)))
         logger.info("Rejected: %s", str(len(rejected_uploads)))
-        logger.info(f"Wall time: {_dt:.2f} sec")
-        logger.info(f"Sumo mode: {str(self.sumo_mode)}")
+        logger.info("Wall time: %.2f sec", _dt)
+        logger.info("Sumo mode: %s", self.sumo_mode)
 
         summary = {
             "upload_summary": {
@@ -259,16 +291,26 @@ def _sanitize_datetimes(data):
 
     Given a dictionary, find and replace all datetime objects
     with isoformat string, so that it does not cause problems for
-    JSON later on."""
+    JSON later on. Dictionaries and lists are updated in place, and
+    walked with an explicit stack instead of recursion."""
 
     if isinstance(data, datetime.datetime):
         return data.isoformat()
 
-    if isinstance(data, dict):
-        for key in data:
-            data[key] = _sanitize_datetimes(data[key])
-
-    elif isinstance(data, list):
-        data = [_sanitize_datetimes(element) for element in data]
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+
+        for key, value in items:
+            if isinstance(value, datetime.datetime):
+                node[key] = value.isoformat()
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
 
     return data
@@ -81,18 +81,29 @@ class SumoFile:
 
     def _upload_metadata(self, sumoclient, sumo_parent_id):
         path = f"/objects('{sumo_parent_id}')"
+        self.metadata["_sumo"]["blob_md5"] = self.blob_md5
         response = sumoclient.post(path=path, json=self.metadata)
         return response
 
-    def _upload_byte_string(self, blob_url):
-        blobclient = BlobClient.from_blob_url(blob_url)
+    def _upload_byte_string(self, blob_url, transport=None):
+        byte_string = self.byte_string
+        return self._upload_blob(
+            blob_url, byte_string, len(byte_string), transport
+        )
+
+    def _upload_blob(self, blob_url, data, length, transport=None):
+        """Upload data (bytes or a binary file object) to blob_url
+
+        transport: shared transport for the blob upload, or None to let
+        the blob client create its own."""
+        blobclient = BlobClient.from_blob_url(blob_url, transport=transport)
         content_settings = ContentSettings(
             content_type="application/octet-stream"
         )
         blobclient.upload_blob(
-            self.byte_string,
+            data,
             blob_type="BlockBlob",
-            length=len(self.byte_string),
+            length=length,
             overwrite=True,
             content_settings=content_settings,
         )
@@ -106,7 +117,9 @@ class SumoFile:
         response = sumoclient.delete(path=path)
         return response
 
-    def upload_to_sumo(self, sumo_parent_id, sumoclient, sumo_mode):
+    def upload_to_sumo(
+        self, sumo_parent_id, sumoclient, sumo_mode, blob_transport=None
+    ):
         """Upload this file to Sumo"""
         # We need these included even if returning before blob upload
         result = {"blob_file_path": self.path, "blob_file_size": self._size}
@@ -213,10 +226,11 @@ class SumoFile:
             )
             return result
 
+        response_json = response.json()
         self.sumo_parent_id = sumo_parent_id
-        self.sumo_object_id = response.json().get("objectid")
+        self.sumo_object_id = response_json.get("objectid")
 
-        blob_url = response.json().get("blob_url")
+        blob_url = response_json.get("blob_url")
 
         # UPLOAD BLOB
 
@@ -260,7 +274,7 @@ class SumoFile:
                     else:
                         # Outer code expects and interprets http error codes
                         logger.warning(
-                            "Seismic upload failed with returncode",
+                            "Seismic upload failed with returncode %s",
                             cmd_result.returncode,
                         )
                         upload_response.update(
@@ -288,7 +302,7 @@ class SumoFile:
                     )
         else:  # non-seismic blob
             try:
-                response = self._upload_byte_string(blob_url)
+                response = self._upload_byte_string(blob_url, blob_transport)
                 upload_response.update(
                     {
                         "status_code": response.status_code,
@@ -370,14 +384,12 @@ class SumoFile:
             metadatafile_path = _path_to_yaml_path(file_path)
             if sumo_mode.lower() == "move":
                 try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
+                    if _remove_if_exists(file_path):
                         logger.debug(
                             "Deleted file after successful upload: %s",
                             file_path,
                         )
-                    if os.path.exists(metadatafile_path):
-                        os.remove(metadatafile_path)
+                    if _remove_if_exists(metadatafile_path):
                         logger.debug(
                             "Deleted metadatafile after successful upload: %s",
                             metadatafile_path,
@@ -392,6 +404,15 @@ class SumoFile:
         return result
 
 
+def _remove_if_exists(path):
+    """Remove a file, return False if it does not exist"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
 def _path_to_yaml_path(path):
     """
     Given a path, return the corresponding yaml file path
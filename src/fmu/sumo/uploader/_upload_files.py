@@ -6,9 +6,9 @@ The function that uploads files.
 
 import json
 from concurrent.futures import ThreadPoolExecutor
-from copy import deepcopy
 
 import yaml
+from azure.core.pipeline.transport import RequestsTransport
 
 from fmu.dataio._utils import read_parameters_txt
 from fmu.dataio.dataio import ExportData
@@ -74,36 +74,80 @@ def get_parameter_file(parameters_path, config_path):
     return paramfile
 
 
-def maybe_upload_realization_and_iteration(sumoclient, base_metadata):
+def search_realization_objects(sumoclient, sumo_parent_id, base_metadata):
+    """Search for the realization, iteration and parameters objects
+
+    One search covers both the realization and iteration objects, found
+    by their ids, and the parameters uploaded for the realization, so
+    that all of them are found in a single round trip.
+
+    Returns:
+        list: the search hits
+    """
+
     realization_uuid = base_metadata["fmu"]["realization"]["uuid"]
     iteration_uuid = base_metadata["fmu"]["iteration"]["uuid"]
+    parameters_query = f"fmu.case.uuid:{sumo_parent_id} AND fmu.realization.uuid:{realization_uuid} AND data.content:parameters"
 
-    hits = sumoclient.post(
+    return sumoclient.post(
         "/search",
         json={
-            "query": {"ids": {"values": [realization_uuid, iteration_uuid]}},
-            "_source": ["class"],
+            "query": {
+                "bool": {
+                    "should": [
+                        {
+                            "ids": {
+                                "values": [realization_uuid, iteration_uuid]
+                            }
+                        },
+                        {"query_string": {"query": parameters_query}},
+                    ]
+                }
+            },
+            "_source": ["class", "_sumo.blob_md5"],
         },
     ).json()["hits"]["hits"]
 
+
+def maybe_upload_realization_and_iteration(sumoclient, base_metadata, hits):
     classes = [hit["_source"]["class"] for hit in hits]
 
     if "realization" not in classes:
-        realization_metadata = deepcopy(base_metadata)
-        del realization_metadata["data"]
-        del realization_metadata["file"]
-        del realization_metadata["display"]
+        # Build the objects from the file metadata without deep copying
+        # it. Only fmu and fmu.context are changed, so only those are
+        # copied, the rest is shared with the file metadata.
+        realization_metadata = {
+            key: value
+            for key, value in base_metadata.items()
+            if key not in ("data", "file", "display")
+        }
         realization_metadata["_sumo"] = {}
         realization_metadata["class"] = "realization"
-        realization_metadata["fmu"]["context"]["stage"] = "realization"
+        realization_metadata["fmu"] = {
+            **base_metadata["fmu"],
+            "context": {
+                **base_metadata["fmu"]["context"],
+                "stage": "realization",
+            },
+        }
 
         case_uuid = realization_metadata["fmu"]["case"]["uuid"]
 
         if "iteration" not in classes:
-            iteration_metadata = deepcopy(realization_metadata)
-            del iteration_metadata["fmu"]["realization"]
-            iteration_metadata["class"] = "iteration"
-            iteration_metadata["fmu"]["context"]["stage"] = "iteration"
+            iteration_metadata = {
+                **realization_metadata,
+                "_sumo": {},
+                "class": "iteration",
+            }
+            iteration_metadata["fmu"] = {
+                key: value
+                for key, value in realization_metadata["fmu"].items()
+                if key != "realization"
+            }
+            iteration_metadata["fmu"]["context"] = {
+                **realization_metadata["fmu"]["context"],
+                "stage": "iteration",
+            }
             sumoclient.post(
                 f"/objects('{case_uuid}')", json=iteration_metadata
             )
@@ -128,40 +172,60 @@ def _upload_files(
 
     for file in files:
         if "fmu" in file.metadata and "realization" in file.metadata["fmu"]:
-            realization_id = file.metadata["fmu"]["realization"]["uuid"]
-
             try:
-                maybe_upload_realization_and_iteration(
-                    sumoclient, file.metadata
+                hits = search_realization_objects(
+                    sumoclient, sumo_parent_id, file.metadata
                 )
             except Exception as e:
                 logger.error(
-                    "Failed to upload realization and iteration objects: %s",
+                    "Failed to search for realization and iteration objects: %s",
                     e.with_traceback(None),
                 )
+                # Still upload the parameters file below
+                hits = []
+            else:
+                try:
+                    maybe_upload_realization_and_iteration(
+                        sumoclient, file.metadata, hits
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Failed to upload realization and iteration objects: %s",
+                        e.with_traceback(None),
+                    )
 
             paramfile = get_parameter_file(parameters_path, config_path)
             if paramfile is not None:
-                query = f"fmu.case.uuid:{sumo_parent_id} AND fmu.realization.uuid:{realization_id} AND data.content:parameters"
-                search_res = sumoclient.get(
-                    "/search", {"$query": query, "$select": "_sumo.blob_md5"}
-                ).json()
+                parameters_hits = [
+                    hit
+                    for hit in hits
+                    if hit["_source"]["class"]
+                    not in ("realization", "iteration")
+                ]
                 # Check if the parameters file does not exist or has changed
                 if (
-                    search_res["hits"]["total"]["value"] == 0
-                    or search_res["hits"]["hits"][0]["_source"]["_sumo"][
-                        "blob_md5"
-                    ]
-                    != paramfile.metadata["_sumo"]["blob_md5"]
+                    len(parameters_hits) == 0
+                    or parameters_hits[0]["_source"]["_sumo"]["blob_md5"]
+                    != paramfile.blob_md5
                 ):
                     files.append(paramfile)
 
             break
 
-    with ThreadPoolExecutor(threads) as executor:
+    # The blob uploads share one transport, so that connections to blob
+    # storage are reused between files. It is closed when all are done.
+    # No point in starting more threads than there are files to upload
+    n_threads = max(1, min(threads, len(files)))
+    with (
+        RequestsTransport() as blob_transport,
+        ThreadPoolExecutor(n_threads) as executor,
+    ):
         results = executor.map(
             _upload_file,
-            [(file, sumoclient, sumo_parent_id, sumo_mode) for file in files],
+            [
+                (file, sumoclient, sumo_parent_id, sumo_mode, blob_transport)
+                for file in files
+            ],
         )
 
     return results
@@ -170,12 +234,13 @@ def _upload_files(
 def _upload_file(args):
     """Upload a file"""
 
-    file, sumoclient, sumo_parent_id, sumo_mode = args
+    file, sumoclient, sumo_parent_id, sumo_mode, blob_transport = args
 
     result = file.upload_to_sumo(
         sumoclient=sumoclient,
         sumo_parent_id=sumo_parent_id,
         sumo_mode=sumo_mode,
+        blob_transport=blob_transport,
     )
 
     result["file"] = file
@@ -5,13 +5,15 @@ import logging
 import os
 import time
 import warnings
-from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from stat import S_ISREG
 
 import httpx
 import yaml
 
-from fmu.sumo.uploader._fileondisk import FileOnDisk
-from fmu.sumo.uploader._logger import get_uploader_logger
+from fmu.sumo.uploader._fileondisk import FileOnDisk, YamlLoader
+from fmu.sumo.uploader._logger import get_uploader_logger, set_logger_level
 from fmu.sumo.uploader._sumocase import SumoCase
 
 logger = get_uploader_logger()
@@ -76,10 +78,10 @@ class CaseOnDisk(SumoCase):
         """
 
         self.verbosity = verbosity
-        logger.setLevel(level=verbosity)
+        set_logger_level(logger, verbosity)
 
         logger.debug("case metadata path: %s", case_metadata_path)
-        self._case_metadata_path = Path(case_metadata_path)
+        self._case_metadata_path = case_metadata_path
         case_metadata = _load_case_metadata(case_metadata_path)
         super().__init__(
             case_metadata,
@@ -90,16 +92,6 @@ class CaseOnDisk(SumoCase):
             parameters_path,
         )
 
-        self._sumo_logger = sumoclient.getLogger("fmu-sumo-uploader")
-        self._sumo_logger.setLevel(logging.INFO)
-        # Avoid that logging to sumo-server also is visible in local logging:
-        self._sumo_logger.propagate = False
-        self._sumo_logger.info(
-            "Initializing Sumo upload for case with sumo_parent_id: "
-            + str(self._sumo_parent_id),
-            extra={"objectUuid": self._sumo_parent_id},
-        )
-
     def __str__(self):
         s = f"{self.__class__}, {len(self._files)} files."
 
@@ -134,14 +126,47 @@ class CaseOnDisk(SumoCase):
         logger.info("Searching for files at %s", search_string)
         file_paths = _find_file_paths(search_string)
 
-        for file_path in file_paths:
-            try:
-                file = FileOnDisk(path=file_path, verbosity=self.verbosity)
-                self._files.append(file)
-                logger.info("File appended: %s", file_path)
+        # Reading metadata is done in threads, the results are collected
+        # here so that warnings are issued in order. The work is waiting
+        # on the disk, so use up to 32 threads regardless of CPU count.
+        with ThreadPoolExecutor(max(1, min(32, len(file_paths)))) as executor:
+            results = executor.map(
+                _index_file,
+                [(file_path, self.verbosity) for file_path in file_paths],
+            )
 
-            except Exception as err:
+        for file_path, file, err in results:
+            if err is not None:
                 warnings.warn(f"No metadata, skipping file: {err}")
+                continue
+
+            self._files.append(file)
+            logger.info("File appended: %s", file_path)
+
+    def _wait_for_case(self, case_uuid):
+        """Wait until the case object is searchable on Sumo.
+
+        Search for the case with increasing delays, and return as soon as
+        it is found. Gives up after waiting about 3 seconds in total."""
+
+        query = f"class:case AND fmu.case.uuid:{case_uuid}"
+        for delay in (0.1, 0.2, 0.4, 0.8, 1.5, None):
+            try:
+                search_results = self.sumoclient.get(
+                    "/search", {"$query": query, "$size": 0}
+                ).json()
+                if search_results["hits"]["total"]["value"] > 0:
+                    return True
+            except Exception as err:
+                logger.debug(
+                    "Searching for case failed: %s", err.with_traceback(None)
+                )
+
+            if delay is not None:
+                time.sleep(delay)
+
+        logger.info("Case %s is not yet searchable on Sumo", case_uuid)
+        return False
 
     def register(self):
         """Register this case on Sumo.
@@ -158,17 +183,17 @@ class CaseOnDisk(SumoCase):
             self._sumo_parent_id = sumo_parent_id
 
             # Give Sumo some time to make the case object searchable.
-            time.sleep(3)
+            self._wait_for_case(self._fmu_case_uuid)
 
             try:
                 self.sumoclient.create_shared_access_key_for_case(
                     self._fmu_case_uuid
                 )
             except Exception as ex:
-                logger.warn(f"Unable to create shared access key: {ex}")
+                logger.warning("Unable to create shared access key: %s", ex)
                 pass
 
-            logger.info("Case registered. SumoID: {}".format(sumo_parent_id))
+            logger.info("Case registered. SumoID: %s", sumo_parent_id)
 
             return sumo_parent_id
         except Exception as err:
@@ -213,25 +238,79 @@ class CaseOnDisk(SumoCase):
 def _load_case_metadata(case_metadata_path: str):
     """Load the case metadata."""
 
-    if not os.path.isfile(case_metadata_path):
+    try:
+        with open(case_metadata_path, "rb") as stream:
+            yaml_data = yaml.load(stream, Loader=YamlLoader)
+        return yaml_data
+    except (FileNotFoundError, IsADirectoryError):
         warnings.warn(
             f"Invalid metadata: file does not exist {case_metadata_path}"
         )
         return {}
-
-    try:
-        with open(case_metadata_path, "r") as stream:
-            yaml_data = yaml.safe_load(stream)
-        return yaml_data
     except Exception:
         warnings.warn(f"Invalid metadata in yml file {case_metadata_path}")
         return {}
 
 
+def _index_file(args):
+    """Create a FileOnDisk, return it along with any error raised"""
+
+    file_path, verbosity = args
+
+    try:
+        file = FileOnDisk(path=file_path, verbosity=verbosity)
+    except Exception as err:
+        return file_path, None, err
+
+    return file_path, file, None
+
+
+def _regular_file_inode(path):
+    """Return the inode number of path if it is a regular file, else None
+
+    Uses a single stat call, following symlinks like os.path.isfile."""
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+
+    return stat_result.st_ino if S_ISREG(stat_result.st_mode) else None
+
+
 def _find_file_paths(search_string):
-    """Find files and return as list of FileOnDisk instances."""
+    """Find files and return their paths, ordered by inode number.
+
+    The files are read in this order when indexed. Inode order follows
+    the layout on disk more closely than name order does, which gives
+    more sequential reads on spinning and network disks."""
+
+    # Group the matches by directory, and read each directory once. The
+    # file type and inode number come from the directory listing, so
+    # regular files are not stat'ed one by one. A directory with a single
+    # match is not listed, as one stat is cheaper than reading it.
+    paths_by_dir = defaultdict(dict)
+    for path in glob.glob(search_string):
+        dir_name, basename = os.path.split(path)
+        paths_by_dir[dir_name][basename] = path
+
+    files = []
+    for dir_name, paths in paths_by_dir.items():
+        if len(paths) == 1:
+            (path,) = paths.values()
+            inode = _regular_file_inode(path)
+            if inode is not None:
+                files.append((inode, path))
+            continue
 
-    files = [f for f in glob.glob(search_string) if os.path.isfile(f)]
+        try:
+            with os.scandir(dir_name or ".") as entries:
+                for entry in entries:
+                    if entry.name in paths and entry.is_file():
+                        files.append((entry.inode(), paths[entry.name]))
+        except OSError:
+            continue
+
+    files = [path for _, path in sorted(files)]
 
     if len(files) == 0:
         warnings.warn("No files found! Please, check the search string.")
@@ -4,7 +4,7 @@ import logging
 import warnings
 
 from fmu.sumo.uploader._fileonjob import FileOnJob
-from fmu.sumo.uploader._logger import get_uploader_logger
+from fmu.sumo.uploader._logger import get_uploader_logger, set_logger_level
 from fmu.sumo.uploader._sumocase import SumoCase
 
 logger = get_uploader_logger()
@@ -19,7 +19,7 @@ class CaseOnJob(SumoCase):
         self, case_metadata: str, sumoclient, verbosity=logging.DEBUG
     ):
         super().__init__(case_metadata, sumoclient)
-        logger.setLevel(level=verbosity)
+        set_logger_level(logger, verbosity)
 
         self.sumoclient = sumoclient
 
@@ -1,10 +1,11 @@
-import subprocess
-
+import httpx
+from azure.core.exceptions import AzureError
 from ert import (
     ForwardModelStepJSON,
     ForwardModelStepPlugin,
     ForwardModelStepValidationError,
 )
+from sumo.wrapper import SumoClient
 
 
 class SumoUpload(ForwardModelStepPlugin):
@@ -42,8 +43,6 @@ class SumoUpload(ForwardModelStepPlugin):
         self, fm_step_json: ForwardModelStepJSON
     ) -> None:
         env = fm_step_json["argList"][2]
-        command = f"sumo_login -e {env} -m silent"
-        return_code = subprocess.call(command, shell=True)
 
         err_msg = (
             "Your config uses Sumo, please authenticate"
@@ -51,5 +50,26 @@ class SumoUpload(ForwardModelStepPlugin):
             f" sumo_login{f' -e {env}' if env != 'prod' else ''}"
         )
 
-        if return_code != 0:
+        if not _is_logged_in(env):
             raise ForwardModelStepValidationError(err_msg)
+
+
+def _is_logged_in(env):
+    """Check for a valid Sumo login, as sumo_login -m silent does.
+
+    Runs in process, rather than starting sumo_login in a subshell.
+    Interactive and device code login are disabled, so that a missing
+    login fails the check instead of waiting for the user."""
+    try:
+        with SumoClient(env, interactive=False, devicecode=False) as sumo:
+            token = sumo.authenticate()
+    except (httpx.HTTPError, OSError, ValueError, AzureError):
+        # Network, token cache and token errors
+        return False
+    except Exception as err:
+        # sumo-wrapper raises a plain Exception when there is no login
+        if type(err) is not Exception:
+            raise
+        return False
+
+    return token is not None
@@ -1,3 +1,4 @@
+import functools
 import importlib
 import os
 import sys
@@ -9,9 +10,11 @@ from ert.shared.plugins.plugin_response import plugin_response
 from fmu.sumo.uploader.forward_models import SumoUpload
 
 
-def _get_jobs_from_directory(directory):
+@functools.cache
+def _find_jobs_in_directory(directory):
     """Do a filesystem lookup in a directory to check
-    for available ERT forward models"""
+    for available ERT forward models. The result is cached, as the
+    lookup is repeated for every job documentation request."""
     resource_directory = (
         Path(sys.modules["fmu.sumo.uploader"].__file__).parent / directory
     )
@@ -24,6 +27,11 @@ def _get_jobs_from_directory(directory):
     return {os.path.basename(path): path for path in all_files}
 
 
+def _get_jobs_from_directory(directory):
+    """Return the available ERT forward models in a directory"""
+    return dict(_find_jobs_in_directory(directory))
+
+
 # pylint: disable=no-value-for-parameter
 @hook_implementation
 @plugin_response(plugin_name="fmu_sumo_uploader")  # pylint: disable=no-value-for-parameter
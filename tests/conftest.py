@@ -12,7 +12,7 @@ def pytest_generate_tests(metafunc):
     token = token if token and len(token) > 0 else None
 
     if "token" in metafunc.fixturenames:
-        metafunc.parametrize("token", [token])
+        metafunc.parametrize("token", [token], scope="session")
 
     if "unique_uuid" in metafunc.fixturenames:
         metafunc.parametrize("unique_uuid", [uuid.uuid4()])
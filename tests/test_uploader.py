@@ -1,4 +1,4 @@
-import contextlib
+import functools
 import json
 import logging
 import os
@@ -6,20 +6,27 @@ import shutil
 import subprocess
 import sys
 import time
+import uuid
 from pathlib import Path
+from unittest import mock
 
+import httpx
 import pytest
 import yaml
 from sumo.wrapper import SumoClient
 
 from fmu.sumo import uploader
 
-if not sys.platform.startswith("darwin") and sys.version_info < (3, 12):
-    import openvds
+try:
+    from yaml import CSafeDumper as YamlDumper
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper
+    from yaml import SafeLoader as YamlLoader
 
-# Run the tests from the root dir
-TEST_DIR = Path(__file__).parent / "../"
-os.chdir(TEST_DIR)
+# The test case, found relative to this file, so that the tests do not
+# depend on the working directory
+TEST_CASE_DIR = (Path(__file__).parent / "data" / "test_case_080").resolve()
 
 ENV = "dev"
 
@@ -27,13 +34,6 @@ logger = logging.getLogger(__name__)
 logger.setLevel(level="DEBUG")
 
 
-def _remove_cached_case_id():
-    """The sumo uploader caches case uuid on disk, but we should remove this
-    file between tests"""
-    with contextlib.suppress(FileNotFoundError):
-        os.remove("tests/data/test_case_080/sumo_parent_id.yml")
-
-
 def _update_metadata_file_with_unique_uuid(metadata_file, unique_case_uuid):
     """Updates an existing sumo metadata file with unique case uuid.
     (To be able to run tests in parallell towards Sumo server,
@@ -41,15 +41,17 @@ def _update_metadata_file_with_unique_uuid(metadata_file, unique_case_uuid):
     """
 
     # Read the sumo metadata file given as input
-    with open(metadata_file) as f:
-        parsed_yaml = yaml.safe_load(f)
+    parsed_yaml = yaml.load(
+        Path(metadata_file).read_bytes(), Loader=YamlLoader
+    )
 
     # Update case uuid with the given unique uuid
     parsed_yaml["fmu"]["case"]["uuid"] = str(unique_case_uuid)
 
     # Update the metadata file using the unique uuid
-    with open(metadata_file, "w") as f:
-        yaml.dump(parsed_yaml, f)
+    Path(metadata_file).write_text(
+        yaml.dump(parsed_yaml, Dumper=YamlDumper), encoding="utf-8"
+    )
 
 
 def _update_metadata_file_absolute_path(metadata_file):
@@ -59,8 +61,9 @@ def _update_metadata_file_absolute_path(metadata_file):
     """
 
     # Read the sumo metadata file given as input
-    with open(metadata_file) as f:
-        parsed_yaml = yaml.safe_load(f)
+    parsed_yaml = yaml.load(
+        Path(metadata_file).read_bytes(), Loader=YamlLoader
+    )
 
     # Update absolute_path
     parsed_yaml["file"]["absolute_path"] = os.path.join(
@@ -69,45 +72,115 @@ def _update_metadata_file_absolute_path(metadata_file):
     print(os.path.join(os.getcwd(), metadata_file))
 
     # Update the metadata file
-    with open(metadata_file, "w") as f:
-        yaml.dump(parsed_yaml, f)
+    Path(metadata_file).write_text(
+        yaml.dump(parsed_yaml, Dumper=YamlDumper), encoding="utf-8"
+    )
 
 
-def _hits_for_case(sumoclient, case_uuid):
+def _search_case(sumoclient, case_uuid, size=0):
+    """Search for the objects in a case, except iterations and realizations,
+    and return the hits part of the response."""
     query = f"fmu.case.uuid:{case_uuid} AND NOT class:iteration AND NOT class:realization"
     search_results = sumoclient.get(
-        "/search", {"$query": query, "$size": 0}
+        "/search", {"$query": query, "$size": size}
     ).json()
-    return search_results.get("hits").get("total").get("value")
+    return search_results["hits"]
 
 
-### TESTS ###
+def _wait_for_hits(sumoclient, case_uuid, expected, timeout=10.0, size=0):
+    """Wait until Sumo has indexed the expected number of objects in a
+    case, and return the hits of the last search.
 
+    Polls the search instead of sleeping for a fixed time, and returns the
+    last hits when timing out, so the caller's assertion reports them."""
+    deadline = time.monotonic() + timeout
+    hits = _search_case(sumoclient, case_uuid, size)
+    while hits["total"]["value"] < expected and time.monotonic() < deadline:
+        time.sleep(0.1)
+        hits = _search_case(sumoclient, case_uuid, size)
+    return hits
 
-def test_initialization(token):
-    """Assert that the CaseOnDisk object can be initialized"""
-    sumoclient = SumoClient(env=ENV, token=token)
 
-    uploader.CaseOnDisk(
-        case_metadata_path="tests/data/test_case_080/case.yml",
-        sumoclient=sumoclient,
-    )
+def _clone(src, dst):
+    """Hard link a file the test will only read, or copy it where hard
+    links are not possible, e.g. across file systems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 
-def test_pre_teardown(token):
-    """Run teardown first to remove remnants from other test runs
-    and prepare for running test suite again."""
+def _copy_test_file(src, dst):
+    """Copy a file from the test data. Metadata files are rewritten in
+    place by the tests, so only the binary files are hard linked."""
+    if src.endswith(".yml"):
+        shutil.copy2(src, dst)
+    else:
+        _clone(src, dst)
 
-    _remove_cached_case_id()
 
+@pytest.fixture(name="sumoclient", scope="session")
+def fixture_sumoclient(token):
+    """Return a Sumo client shared by all tests, so that connections and
+    authentication are reused instead of set up again in every test."""
+    return SumoClient(env=ENV, token=token)
 
-def test_upload_without_registration(token, unique_uuid):
-    """Assert that attempting to upload to a non-existing/un-registered case gives warning."""
-    sumoclient = SumoClient(env=ENV, token=token)
 
-    _remove_cached_case_id()
+@pytest.fixture(name="sumo_cleanup", scope="session")
+def fixture_sumo_cleanup(sumoclient):
+    """Return a list to append the sumo_parent_id of registered cases to.
+    The cases are deleted from Sumo when all tests have run."""
+    parent_ids = []
+    yield parent_ids
+
+    for parent_id in parent_ids:
+        try:
+            sumoclient.delete(path=f"/objects('{parent_id}')")
+        except Exception as err:
+            logger.warning("Could not delete case %s: %s", parent_id, err)
+
+
+@pytest.fixture(name="openvds")
+def fixture_openvds():
+    """Return the openvds module. It is imported by the tests that use it,
+    instead of when collecting tests, as loading it is slow."""
+    import openvds
+
+    return openvds
+
+
+@pytest.fixture(name="case_dir")
+def fixture_case_dir(tmp_path):
+    """Return a copy of the test case folder for a single test.
+
+    Tests update the metadata files with unique case uuids, so each test
+    works on its own copy. This keeps tests independent of each other,
+    also when running in parallel with pytest-xdist. The seismic file is
+    large and only used by one test, so it is not copied here."""
+    case_dir = tmp_path / "test_case_080"
+    shutil.copytree(
+        TEST_CASE_DIR,
+        case_dir,
+        ignore=shutil.ignore_patterns("seismic.segy"),
+        copy_function=_copy_test_file,
+    )
+    return case_dir
+
+
+### TESTS ###
+
+
+def test_initialization(sumoclient, case_dir):
+    """Assert that the CaseOnDisk object can be initialized"""
+    uploader.CaseOnDisk(
+        case_metadata_path=str(case_dir / "case.yml"),
+        sumoclient=sumoclient,
+    )
+
 
-    case_file = "tests/data/test_case_080/case.yml"
+def test_upload_without_registration(sumoclient, unique_uuid, case_dir):
+    """Assert that attempting to upload to a non-existing/un-registered case gives warning."""
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
 
     case = uploader.CaseOnDisk(
@@ -117,23 +190,19 @@ def test_upload_without_registration(token, unique_uuid):
     )
 
     # On purpose NOT calling case.register before adding file here
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     case.add_files(child_binary_file)
     with pytest.warns(UserWarning, match="Case is not registered"):
         case.upload(threads=1)
 
 
-def test_case(token):
+def test_case(sumoclient, case_dir, sumo_cleanup):
     """Assert that after uploading case to Sumo, the case is there and is the only one."""
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
 
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
@@ -153,7 +222,7 @@ def test_case(token):
 
     # Register the case
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
     # assert that the case is there now
     search_results = sumoclient.get(
@@ -163,22 +232,15 @@ def test_case(token):
     logger.debug(search_results.get("hits"))
     assert len(hits) == 1
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
-def test_case_with_restricted_child(token, unique_uuid):
+def test_case_with_restricted_child(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """Assert that uploading a child with 'classification: restricted' works.
     Assumes that the identity running this test have enough rights for that."""
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
 
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
@@ -187,70 +249,50 @@ def test_case_with_restricted_child(token, unique_uuid):
 
     # Register the case
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
-    child_binary_file = "tests/data/test_case_080/surface_restricted.bin"
-    child_metadata_file = (
-        "tests/data/test_case_080/.surface_restricted.bin.yml"
-    )
+    child_binary_file = str(case_dir / "surface_restricted.bin")
+    child_metadata_file = str(case_dir / ".surface_restricted.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
     e.upload()
-    time.sleep(1)
 
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
 
-
-def test_case_with_one_child(token, unique_uuid):
+def test_case_with_one_child(sumoclient, unique_uuid, case_dir, sumo_cleanup):
     """Upload one file to Sumo. Assert that it is there."""
 
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
     e.upload()
-    time.sleep(1)
 
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
 def test_case_with_one_child_and_params(
-    token, unique_uuid, tmp_path, monkeypatch
+    sumoclient, unique_uuid, tmp_path, monkeypatch, case_dir, sumo_cleanup
 ):
     """Upload one file to Sumo. Assert that it is there."""
 
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
 
     # Create fmu like structure
@@ -267,12 +309,12 @@ def test_case_with_one_child_and_params(
 
     share_path.mkdir(parents=True)
     fmu_config_folder.mkdir(parents=True)
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
-    fmu_globals_config = "tests/data/test_case_080/global_variables.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
+    fmu_globals_config = str(case_dir / "global_variables.yml")
     tmp_binary_file_location = str(share_path / "surface.bin")
-    shutil.copy(child_binary_file, tmp_binary_file_location)
-    shutil.copy(fmu_globals_config, config_tmp_path)
+    _clone(child_binary_file, tmp_binary_file_location)
+    _clone(fmu_globals_config, config_tmp_path)
     print(
         "Fmu config path: ",
         config_tmp_path,
@@ -280,7 +322,7 @@ def test_case_with_one_child_and_params(
         config_tmp_path.exists(),
     )
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
-    shutil.copy(child_metadata_file, share_path / ".surface.bin.yml")
+    _clone(child_metadata_file, share_path / ".surface.bin.yml")
 
     param_file = real_path / "parameters.txt"
     param_file.write_text("TESTINGTESTING 1")
@@ -295,21 +337,13 @@ def test_case_with_one_child_and_params(
         sumoclient=sumoclient,
     )
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
     e.add_files(tmp_binary_file_location)
     e.upload()
     # search_string = f"{str(share_path)}/*"
     # sumo_upload_main(case_path, search_string, ENV, search_string, 1)
-    time.sleep(1)
-
-    query = (
-        f"{e.fmu_case_uuid} AND NOT class:iteration AND NOT class:realization"
-    )
-    search_results = sumoclient.get(
-        "/search", {"$query": query, "$size": 100}
-    ).json()
-    hits = search_results["hits"]
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 3, size=100)
     results = hits["hits"]
     expected_res = [
         "case",
@@ -325,109 +359,89 @@ def test_case_with_one_child_and_params(
     total = hits["total"]["value"]
     assert total == len(expected_res)
 
-    # # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
-def test_case_with_one_child_with_affiliate_access(token, unique_uuid):
+def test_case_with_one_child_with_affiliate_access(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """Upload one file to Sumo with affiliate access.
     Assert that it is there."""
 
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
-    child_binary_file = "tests/data/test_case_080/surface_affiliate.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface_affiliate.bin.yml"
+    child_binary_file = str(case_dir / "surface_affiliate.bin")
+    child_metadata_file = str(case_dir / ".surface_affiliate.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
     e.upload()
-    time.sleep(1)
 
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
-def test_case_with_no_children(token, unique_uuid):
+def test_case_with_no_children(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """Test failure handling when no files are found"""
 
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
     logger.debug("initialize CaseOnDisk")
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
-    time.sleep(1)
+    sumo_cleanup.append(e.sumo_parent_id)
 
     with pytest.warns(UserWarning) as warnings_record:
-        e.add_files("tests/data/test_case_080/NO_SUCH_FILES_EXIST.*")
+        e.add_files(str(case_dir / "NO_SUCH_FILES_EXIST.*"))
         e.upload()
-        time.sleep(1)
         for _ in warnings_record:
             assert len(warnings_record) == 2, warnings_record
             assert (
                 warnings_record[0].message.args[0].startswith("No files found")
             )
 
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _search_case(sumoclient, e.fmu_case_uuid)
+    total = hits["total"]["value"]
     assert total == 1
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
 
-
-def test_missing_child_metadata(token, unique_uuid):
+def test_missing_child_metadata(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """
     Try to upload files where one does not have metadata. Assert that warning is given
     and that upload commences with the other files. Check that the children are present.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
+    sumo_cleanup.append(e.sumo_parent_id)
 
     # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
 
     # Assert that expected warning is given when the binary file
     # do not have a companion metadata file
     with pytest.warns(UserWarning) as warnings_record:
-        e.add_files("tests/data/test_case_080/surface_no_metadata.bin")
+        e.add_files(str(case_dir / "surface_no_metadata.bin"))
         for _ in warnings_record:
             assert len(warnings_record) == 1, warnings_record
             assert warnings_record[0].message.args[0].startswith(
@@ -437,27 +451,18 @@ def test_missing_child_metadata(token, unique_uuid):
             )
 
     e.upload()
-    time.sleep(1)
 
     # Assert parent and valid child is on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
-def test_invalid_yml_in_case_metadata(token, unique_uuid):
+def test_invalid_yml_in_case_metadata(sumoclient, unique_uuid, case_dir):
     """
     Try to upload case file where the metadata file is not valid yml.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case_invalid.yml"
+    case_file = str(case_dir / "case_invalid.yml")
     # Invalid yml file, skip _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     with pytest.warns(UserWarning) as warnings_record:
         uploader.CaseOnDisk(
@@ -473,57 +478,47 @@ def test_invalid_yml_in_case_metadata(token, unique_uuid):
             )
 
 
-def test_invalid_yml_in_child_metadata(token, unique_uuid):
+def test_invalid_yml_in_child_metadata(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """
     Try to upload child with invalid yml in its metadata file.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
+    sumo_cleanup.append(e.sumo_parent_id)
 
     # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
 
     # Add a child with invalid yml in its metadata file
-    problem_binary_file = "tests/data/test_case_080/surface_invalid.bin"
-    # problem_metadata_file = "tests/data/test_case_080/.surface_invalid.bin.yml"
+    problem_binary_file = str(case_dir / "surface_invalid.bin")
+    # problem_metadata_file = str(case_dir / ".surface_invalid.bin.yml")
     # Skip this since file is not valid yml: _update_metadata_file_with_unique_uuid(problem_metadata_file, unique_uuid)
     with pytest.warns(UserWarning, match="No metadata*"):
         e.add_files(problem_binary_file)
 
     e.upload()
-    time.sleep(1)
 
     # Assert parent and only 1 valid child are on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
 
-
-def test_schema_error_in_case(token, unique_uuid):
+def test_schema_error_in_case(sumoclient, unique_uuid, case_dir):
     """
     Try to upload files where case have metadata with error.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case_error.yml"
+    case_file = str(case_dir / "case_error.yml")
     # Cannot update invalid yml file: skip: _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     with pytest.warns(UserWarning, match="Registering case on Sumo failed*"):
         e = uploader.CaseOnDisk(
@@ -533,51 +528,47 @@ def test_schema_error_in_case(token, unique_uuid):
         e.register()
 
 
-def test_schema_error_in_child(token, unique_uuid):
+def test_schema_error_in_child(
+    sumoclient, unique_uuid, case_dir, sumo_cleanup
+):
     """
     Try to upload files where one does have metadata with error. Assert that warning is given
     and that upload commences with the other files. Check that the children are present.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
+    case_file = str(case_dir / "case.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
+    sumo_cleanup.append(e.sumo_parent_id)
 
     # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     e.add_files(child_binary_file)
 
     # Add a child with problem in its metadata file
-    problem_binary_file = "tests/data/test_case_080/surface_error.bin"
-    problem_metadata_file = "tests/data/test_case_080/.surface_error.bin.yml"
+    problem_binary_file = str(case_dir / "surface_error.bin")
+    problem_metadata_file = str(case_dir / ".surface_error.bin.yml")
     _update_metadata_file_with_unique_uuid(problem_metadata_file, unique_uuid)
     e.add_files(problem_binary_file)
 
     e.upload()
-    time.sleep(1)
 
     # Assert parent and valid child are on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
 
+@functools.cache
 def _get_segy_path(segy_command):
     """Find the path to the OpenVDS SEGYImport or SEGYExport executables.
-    Supply either 'SEGYImport' or 'SEGYExport' as parameter"""
+    Supply either 'SEGYImport' or 'SEGYExport' as parameter. The path is
+    cached for later calls"""
     if sys.platform.startswith("win"):
         segy_command = segy_command + ".exe"
     python_path = os.path.dirname(sys.executable)
@@ -598,7 +589,7 @@ def _get_segy_path(segy_command):
             break
     if path_to_executable is None:
         logger.error("Could not find OpenVDS executables folder location")
-    logger.info("Path to OpenVDS executable: " + path_to_executable)
+    logger.info("Path to OpenVDS executable: %s", path_to_executable)
     return path_to_executable
 
 
@@ -620,26 +611,25 @@ def test_openvds_available():
     sys.platform.startswith("darwin") or sys.version_info >= (3, 12),
     reason="do not run OpenVDS SEGYImport on mac os or python 3.12",
 )
-def test_seismic_openvds_file(token, unique_uuid):
+def test_seismic_openvds_file(sumoclient, unique_uuid, case_dir, openvds):
     """Upload seimic in OpenVDS format to Sumo. Assert that it is there."""
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    case_file = "tests/data/test_case_080/case_segy.yml"
+    case_file = str(case_dir / "case_segy.yml")
     _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
     )
     e.register()
-    time.sleep(1)
 
-    child_binary_file = "tests/data/test_case_080/seismic.segy"
-    child_metadata_file = "tests/data/test_case_080/.seismic.segy.yml"
+    # The seismic file is not in case_dir, as only this test uses it
+    _clone(TEST_CASE_DIR / "seismic.segy", case_dir / "seismic.segy")
+    child_binary_file = str(case_dir / "seismic.segy")
+    child_metadata_file = str(case_dir / ".seismic.segy.yml")
     _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
     segy_filepath = child_binary_file
     e.add_files(segy_filepath)
     e.upload()
-    time.sleep(1)
+    _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
 
     # Read the parent object from Sumo
     query = f"_sumo.parent_object:{e.fmu_case_uuid} AND NOT class:iteration AND NOT class:realization"
@@ -665,152 +655,132 @@ def test_seismic_openvds_file(token, unique_uuid):
     token_results = sumoclient.get(method).content
     # Sumo server have had 2 different ways of returning the SAS token,
     # and this code should be able to work with both
+    token_text = token_results.decode("utf-8")
     try:
-        url = (
-            "azureSAS:"
-            + json.loads(token_results.decode("utf-8")).get("baseuri")[6:]
-            + child_id
-        )
-        url_conn = "Suffix=?" + json.loads(token_results.decode("utf-8")).get(
-            "auth"
-        )
-    except:  # noqa: E722
-        token_results = token_results.decode("utf-8")
-        url = "azureSAS" + token_results.split("?")[0][5:] + "/"
-        url_conn = "Suffix=?" + token_results.split("?")[1]
+        auth = json.loads(token_text)
+        url = "azureSAS:" + auth["baseuri"][6:] + child_id
+        url_conn = "Suffix=?" + auth["auth"]
+    except (json.JSONDecodeError, KeyError, TypeError):
+        base_url, _, sas = token_text.partition("?")
+        url = "azureSAS" + base_url[5:] + "/"
+        url_conn = "Suffix=?" + sas
 
     # Export from az blob store to a segy file on local disk
     # Openvds 3.4.0 workarounds:
     #     SEGYExport fails on 3 out of 4 attempts, hence retry loop
     #     SEGYExport does not work on ubuntu, hence the platform check
+    # Retries back off exponentially, and give up after 10 minutes
     export_succeeded = False
     export_retries = 0
+    export_deadline = time.monotonic() + 600
     if not sys.platform.startswith("linux"):
-        while not export_succeeded and export_retries < 40:
+        path_to_segy_export = _get_segy_path("SEGYExport")
+        exported_file = case_dir / "exported.segy"
+        while not export_succeeded and time.monotonic() < export_deadline:
             print("SEGYExport retry", export_retries)
-            exported_filepath = "exported.segy"
-            if os.path.exists(exported_filepath):
-                os.remove(exported_filepath)
-            path_to_segy_export = _get_segy_path("SEGYExport")
+            exported_file.unlink(missing_ok=True)
             cmdstr = [
                 path_to_segy_export,
                 "--url",
                 url,
                 "--connection",
                 url_conn,
-                "exported.segy",
+                str(exported_file),
             ]
+            # Only the error output is kept, for reporting failed attempts
             cmd_result = subprocess.run(
-                cmdstr, capture_output=True, text=True, shell=False
+                cmdstr,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                shell=False,
             )
 
             if cmd_result.returncode == 0:
-                assert os.path.isfile(exported_filepath)
+                assert exported_file.is_file()
                 assert (
-                    os.stat(exported_filepath).st_size
+                    exported_file.stat().st_size
                     == os.stat(segy_filepath).st_size
                 )
-                if os.path.exists(exported_filepath):
-                    os.remove(exported_filepath)
+                exported_file.unlink()
                 print("SEGYExport succeeded on retry", export_retries)
                 export_succeeded = True
             else:
-                time.sleep(16)
+                print("SEGYExport failed:", cmd_result.stderr)
+                time.sleep(min(30, 2**export_retries))
 
             export_retries += 1
 
         assert export_succeeded
 
     # Use OpenVDS Python API to read directly from az cloud storage
+    # Check the layout from one handle, and close it before the deletion
     handle = openvds.open(url, url_conn)
     layout = openvds.getLayout(handle)
-    channel_count = layout.getChannelCount()
-    assert channel_count == 3
+    assert layout.getChannelCount() == 3
     assert layout.getChannelName(0) == "Amplitude"
+    openvds.close(handle)
 
     # Delete this case
     path = f"/objects('{e.fmu_case_uuid}')"
     sumoclient.delete(path=path)
-    # Sumo/Azure removes the container which takes some time
-    time.sleep(30)
+
+    # Sumo/Azure removes the container which takes some time, so wait
+    # until OpenVDS reads fail, checking more rarely as time passes
+    deadline = time.monotonic() + 60
+    delay = 0.5
+    while time.monotonic() < deadline:
+        try:
+            openvds.close(openvds.open(url, url_conn))
+        except RuntimeError:
+            break
+        time.sleep(delay)
+        delay = min(8, delay * 2)
 
     # OpenVDS reads should fail after deletion
     with pytest.raises(RuntimeError, match="Error on downloading*"):
-        handle = openvds.open(url, url_conn)
+        openvds.open(url, url_conn)
 
 
 @pytest.mark.skipif(
     sys.platform.startswith("win"),
     reason="do not run on windows due to file-path differences",
 )
-def test_sumo_mode_default(token, unique_uuid):
-    """
-    Test that SUMO_MODE defaults to copy, i.e. not deleting file after upload.
-    """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
-    _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
-    e = uploader.CaseOnDisk(
-        case_metadata_path=case_file,
-        sumoclient=sumoclient,
-    )
-    e.register()
-
-    # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
-    _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
-    e.add_files(child_binary_file)
-
-    # Ensure that the absolute_path is correctly set in metadatafile
-    # (The test files have dummy value for absolute_path)
-    _update_metadata_file_absolute_path(child_metadata_file)
-
-    e.upload()
-    time.sleep(1)
-
-    # Assert parent and valid child are on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
-    assert total == 2
-
-    # Assert that child file and metadatafile are not deleted
-    assert os.path.exists(child_binary_file)
-    assert os.path.exists(child_metadata_file)
-
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
-
-@pytest.mark.skipif(
-    sys.platform.startswith("win"),
-    reason="do not run on windows due to file-path differences",
+@pytest.mark.parametrize(
+    ("sumo_mode", "expect_deleted"),
+    [
+        (None, False),
+        ("copy", False),
+        ("moVE", True),  # test case-insensitive
+    ],
 )
-def test_sumo_mode_copy(token, unique_uuid):
+def test_sumo_mode(
+    sumoclient, case_dir, sumo_cleanup, sumo_mode, expect_deleted
+):
     """
-    Test SUMO_MODE=copy, i.e. not deleting file after upload.
+    Test SUMO_MODE: copy, the default, does not delete files after upload,
+    while move deletes them.
     """
-    sumoclient = SumoClient(env=ENV, token=token)
+    # unique_uuid is shared by the parameters of a test, so each sumo_mode
+    # gets its own case uuid
+    case_uuid = uuid.uuid4()
 
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
-    _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
+    case_file = str(case_dir / "case.yml")
+    _update_metadata_file_with_unique_uuid(case_file, case_uuid)
+    case_args = {} if sumo_mode is None else {"sumo_mode": sumo_mode}
     e = uploader.CaseOnDisk(
         case_metadata_path=case_file,
         sumoclient=sumoclient,
-        sumo_mode="copy",
+        **case_args,
     )
     e.register()
+    sumo_cleanup.append(e.sumo_parent_id)
 
-    # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.yml"
-    _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
+    # Add a valid child. The files are deleted after upload in move mode,
+    # which is fine since case_dir is a copy of the test data
+    child_binary_file = str(case_dir / "surface.bin")
+    child_metadata_file = str(case_dir / ".surface.bin.yml")
+    _update_metadata_file_with_unique_uuid(child_metadata_file, case_uuid)
     e.add_files(child_binary_file)
 
     # Ensure that the absolute_path is correctly set in metadatafile
@@ -818,97 +788,57 @@ def test_sumo_mode_copy(token, unique_uuid):
     _update_metadata_file_absolute_path(child_metadata_file)
 
     e.upload()
-    time.sleep(1)
 
     # Assert parent and valid child are on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
+    hits = _wait_for_hits(sumoclient, e.fmu_case_uuid, 2)
+    total = hits["total"]["value"]
     assert total == 2
 
-    # Assert that child file and metadatafile are not deleted
-    assert os.path.exists(child_binary_file)
-    assert os.path.exists(child_metadata_file)
-
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
-
-
-@pytest.mark.skipif(
-    sys.platform.startswith("win"),
-    reason="do not run on windows due to file-path differences",
+    # Assert that child file and metadatafile are deleted in move mode only
+    assert os.path.exists(child_binary_file) is not expect_deleted
+    assert os.path.exists(child_metadata_file) is not expect_deleted
+
+
+@pytest.mark.parametrize(
+    "authenticate, expected",
+    [
+        ({"return_value": "access-token"}, True),
+        ({"return_value": None}, False),
+        (
+            {"side_effect": Exception("No valid authorization provider")},
+            False,
+        ),
+        ({"side_effect": httpx.ConnectError("Connection refused")}, False),
+    ],
 )
-def test_sumo_mode_move(token, unique_uuid):
-    """
-    Test SUMO_MODE=move, i.e. deleting file after upload.
-    """
-    sumoclient = SumoClient(env=ENV, token=token)
-
-    _remove_cached_case_id()
-
-    case_file = "tests/data/test_case_080/case.yml"
-    _update_metadata_file_with_unique_uuid(case_file, unique_uuid)
-    e = uploader.CaseOnDisk(
-        case_metadata_path=case_file,
-        sumoclient=sumoclient,
-        sumo_mode="moVE",  # test case-insensitive
-    )
-    e.register()
-
-    # Make copy of binary and metadatafile, so the delete
-    # is not messing with git status
-    shutil.copy2(
-        "tests/data/test_case_080/surface.bin",
-        "tests/data/test_case_080/surface.bin.copy",
-    )
-    shutil.copy2(
-        "tests/data/test_case_080/.surface.bin.yml",
-        "tests/data/test_case_080/.surface.bin.copy.yml",
+def test_is_logged_in(monkeypatch, authenticate, expected):
+    """Assert that the forward model login check reports the result of
+    SumoClient.authenticate, without interactive login."""
+    forward_models = pytest.importorskip("fmu.sumo.uploader.forward_models")
+
+    client = mock.MagicMock()
+    client.__enter__.return_value = client
+    client.authenticate.configure_mock(**authenticate)
+    client_class = mock.Mock(return_value=client)
+    monkeypatch.setattr(forward_models, "SumoClient", client_class)
+
+    assert forward_models._is_logged_in(ENV) is expected
+    client_class.assert_called_once_with(
+        ENV, interactive=False, devicecode=False
     )
+    client.__exit__.assert_called_once()
 
-    # Add a valid child
-    child_binary_file = "tests/data/test_case_080/surface.bin.copy"
-    child_metadata_file = "tests/data/test_case_080/.surface.bin.copy.yml"
-    _update_metadata_file_with_unique_uuid(child_metadata_file, unique_uuid)
-    e.add_files(child_binary_file)
-
-    # Ensure that the absolute_path is correctly set in metadatafile
-    # (The test files have dummy value for absolute_path)
-    _update_metadata_file_absolute_path(child_metadata_file)
-
-    e.upload()
-    time.sleep(1)
-
-    # Assert parent and valid child are on Sumo
-    total = _hits_for_case(sumoclient, e.fmu_case_uuid)
-    assert total == 2
 
-    # Assert that child file and metadatafile are deleted
-    assert not os.path.exists(child_metadata_file)
-    assert not os.path.exists(child_binary_file)
-
-    # Delete this case
-    logger.debug("Cleanup after test: delete case")
-    path = f"/objects('{e.sumo_parent_id}')"
-    sumoclient.delete(path=path)
+def test_is_logged_in_raises_programming_errors(monkeypatch):
+    """Assert that the login check does not hide unexpected errors"""
+    forward_models = pytest.importorskip("fmu.sumo.uploader.forward_models")
 
+    client = mock.MagicMock()
+    client.__enter__.return_value = client
+    client.authenticate.side_effect = TypeError("unexpected")
+    monkeypatch.setattr(
+        forward_models, "SumoClient", mock.Mock(return_value=client)
+    )
 
-def test_teardown(token):
-    """Teardown all testdata between every test"""
-
-    _remove_cached_case_id()
-
-    # Set all the metadata files back to same case uuid as before, to avoid
-    # git reporting changes.
-    test_dir = "tests/data/test_case_080/"
-    files = os.listdir(test_dir)
-    for f in files:
-        if (
-            f.endswith(".yml")
-            and f.startswith(".")
-            and not f.__contains__("invalid")
-        ):
-            dest_file = test_dir + os.path.sep + f
-            _update_metadata_file_with_unique_uuid(
-                dest_file, "11111111-1111-1111-1111-111111111111"
-            )
+    with pytest.raises(TypeError):
+        forward_models._is_logged_in(ENV)